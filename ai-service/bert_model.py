@@ -8,6 +8,7 @@ BERT Prediction Module - Version 5.3 (Stable)
 """
 
 from transformers import BertForSequenceClassification, BertTokenizer
+from torch.utils.data import DataLoader
 import torch
 import os
 
@@ -107,6 +108,73 @@ def classify_text(text: str):
 
     final_scores /= len(chunks)
 
+    return _finalize(final_scores)
+
+
+# ==================================================
+# BATCHED PREDICTION (bulk / offline use)
+# ==================================================
+def classify_batch(texts, batch_size: int = 32):
+    """Classify many documents at once.
+
+    Chunks from all documents are pooled and run through the model in
+    fixed-size batches; per-document scores are averaged exactly as in
+    classify_text.
+    """
+    results = [None] * len(texts)
+    pending = [i for i, t in enumerate(texts) if t and len(t.strip()) >= 30]
+    for i in set(range(len(texts))) - set(pending):
+        results[i] = ("NotResearch", 0.99)
+
+    if not pending:
+        return results
+
+    tokenizer, model = _load_model()
+
+    chunks, owners = [], []
+    for i in pending:
+        for chunk in _chunk_text(texts[i], tokenizer):
+            chunks.append(chunk)
+            owners.append(i)
+
+    def collate(batch):
+        return tokenizer(
+            batch,
+            truncation=True,
+            padding="max_length",
+            max_length=256,
+            return_tensors="pt"
+        )
+
+    loader = DataLoader(chunks, batch_size=batch_size, collate_fn=collate)
+
+    scores = torch.zeros(len(texts), len(LABELS), dtype=torch.float32)
+    counts = torch.zeros(len(texts), dtype=torch.float32)
+    owners = torch.tensor(owners, dtype=torch.long)
+
+    offset = 0
+    for enc in loader:
+        enc = {k: v.to(DEVICE) for k, v in enc.items()}
+
+        with torch.no_grad():
+            out = model(**enc)
+            probs = torch.softmax(out.logits, dim=1).cpu()
+
+        idx = owners[offset:offset + probs.shape[0]]
+        scores.index_add_(0, idx, probs)
+        counts.index_add_(0, idx, torch.ones(probs.shape[0]))
+        offset += probs.shape[0]
+
+    for i in pending:
+        results[i] = _finalize(scores[i] / counts[i].clamp(min=1))
+
+    return results
+
+
+# ==================================================
+# SCORE → (label, confidence)
+# ==================================================
+def _finalize(final_scores):
     idx = torch.argmax(final_scores).item()
     label = LABELS[idx]
     confidence = float(final_scores[idx])
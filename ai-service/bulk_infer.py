@@ -0,0 +1,215 @@
+"""
+IntelliInsight Offline Bulk Inference (CLI)
+- Walks a directory tree of PDFs
+- Text extraction in a process pool (one worker per core by default)
+- Batched BERT inference (DataLoader over pooled chunks)
+- JSONL output with checkpointing (interrupted runs resume)
+- Optional Parquet export + docs/sec reporting
+
+Usage:
+    python bulk_infer.py archive/ -o results.jsonl [--parquet results.parquet]
+"""
+
+import os
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import torch
+
+import pdf_extractors
+from main import (
+    extract_text_from_pdf,
+    looks_like_non_research,
+    build_analysis,
+    NON_RESEARCH_RESULT,
+)
+from bert_model import classify_batch
+
+
+# ==============================
+# File discovery + checkpoint
+# ==============================
+def find_pdfs(root: str):
+    # absolute paths so "archive/" and "./archive" resume the same run
+    for dirpath, _, filenames in os.walk(os.path.abspath(root)):
+        for name in sorted(filenames):
+            if name.lower().endswith(".pdf"):
+                yield os.path.join(dirpath, name)
+
+
+def repair_checkpoint(output: str):
+    """Cut a truncated last line left by an interrupted run, so appended
+    rows start on a fresh line and the file stays valid JSONL."""
+    if not os.path.exists(output):
+        return
+
+    with open(output, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            block = f.read(step)
+            nl = block.rfind(b"\n")
+            if nl != -1:
+                pos = pos - step + nl + 1
+                break
+            pos -= step
+
+        if pos != end:
+            f.truncate(pos)
+            print(f"[WARN] Dropped {end - pos} bytes of a partial line from {output}")
+
+
+def load_done(output: str) -> set:
+    """Paths already present in the JSONL output (resume support)."""
+    done = set()
+    if not os.path.exists(output):
+        return done
+
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(json.loads(line)["path"])
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+# ==============================
+# Worker: PDF → text
+# ==============================
+def _init_worker():
+    # the pool already uses every core; no nested page-parallel extraction
+    pdf_extractors.PDF_PARALLEL_MAX_WORKERS = 1
+
+
+def _extract(path: str):
+    try:
+        with open(path, "rb") as f:
+            return path, extract_text_from_pdf(f.read()), None
+    except Exception as e:
+        return path, None, str(e)
+
+
+# ==============================
+# Batch inference + write
+# ==============================
+def _flush(batch, out, batch_size: int) -> int:
+    rows = []
+    to_classify = []
+
+    for path, text, error in batch:
+        if error is not None:
+            rows.append({"path": path, "success": False, "error": error})
+        elif looks_like_non_research(text):
+            rows.append({"path": path, **NON_RESEARCH_RESULT})
+        else:
+            to_classify.append((path, text))
+
+    if to_classify:
+        preds = classify_batch([t for _, t in to_classify], batch_size=batch_size)
+        for (path, text), (label, conf) in zip(to_classify, preds):
+            result = build_analysis(os.path.basename(path), text, label, conf)
+            rows.append({"path": path, **result})
+
+    for row in rows:
+        out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    out.flush()
+
+    return len(rows)
+
+
+def run(args):
+    repair_checkpoint(args.output)
+    done = load_done(args.output)
+    paths = [p for p in find_pdfs(args.input_dir) if p not in done]
+    print(f"📂 {len(paths)} PDFs to process ({len(done)} already done)")
+
+    if not paths:
+        return
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    workers = args.workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    processed = 0
+    start = time.perf_counter()
+
+    with open(args.output, "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+
+        todo = iter(paths)
+        in_flight = set()
+        batch = []
+
+        while True:
+            # keep the extraction pool saturated while inference runs
+            for path in todo:
+                in_flight.add(pool.submit(_extract, path))
+                if len(in_flight) >= max_in_flight:
+                    break
+
+            if not in_flight:
+                break
+
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            batch.extend(f.result() for f in finished)
+
+            if len(batch) >= args.docs_per_batch:
+                processed += _flush(batch, out, args.batch_size)
+                batch = []
+                elapsed = time.perf_counter() - start
+                print(f"  {processed}/{len(paths)} docs — {processed / elapsed:.2f} docs/sec")
+
+        if batch:
+            processed += _flush(batch, out, args.batch_size)
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ Processed {processed} docs in {elapsed:.1f}s "
+          f"({processed / elapsed:.2f} docs/sec) → {args.output}")
+
+
+# ==============================
+# Parquet export
+# ==============================
+def export_parquet(jsonl_path: str, parquet_path: str):
+    import pandas as pd
+
+    df = pd.read_json(jsonl_path, lines=True)
+    # nested lists/dicts are not portable across parquet readers
+    for col in ("keywords", "evidence"):
+        if col in df:
+            df[col] = df[col].apply(lambda v: json.dumps(v) if isinstance(v, list) else v)
+    df.to_parquet(parquet_path, index=False)  # requires pyarrow
+    print(f"📦 Exported {len(df)} rows → {parquet_path}")
+
+
+# ==============================
+# MAIN
+# ==============================
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline bulk inference over a directory of PDFs.")
+    parser.add_argument("input_dir", help="Directory tree to scan for PDFs")
+    parser.add_argument("-o", "--output", default="bulk_results.jsonl",
+                        help="JSONL output (also the resume checkpoint)")
+    parser.add_argument("--parquet", help="Also export results to this Parquet file")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Extraction processes (default: all cores)")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Torch intra-op threads for inference (default: torch's choice)")
+    parser.add_argument("--batch-size", type=int, default=32,
+                        help="Chunks per forward pass")
+    parser.add_argument("--docs-per-batch", type=int, default=64,
+                        help="Documents grouped per inference round / checkpoint")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run(args)
+    if args.parquet:
+        export_parquet(args.output, args.parquet)
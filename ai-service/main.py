@@ -6,19 +6,17 @@ Improved PDF extraction + Non-research detection + stable BERT flow
 import os
 import logging
 from datetime import datetime
-from typing import Tuple
+from typing import Tuple, Optional
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 import nltk
 import spacy
-from io import BytesIO
-from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.converter import TextConverter
-from pdfminer.layout import LAParams
-from pdfminer.pdfpage import PDFPage
+
+from pdf_extractors import extract_with_fallback
+from profiling import start_profile, stop_profile, PROFILE_HEADER
 
 
 # -----------------------------------
@@ -55,23 +53,14 @@ logger = logging.getLogger(__name__)
 
 
 # ======================================================
-# SMART PDF EXTRACTOR (High Accuracy)
+# SMART PDF EXTRACTOR (pluggable backends)
 # ======================================================
-def extract_text_from_pdf(content: bytes) -> str:
-    """Extract readable text from PDF bytes using pdfminer for accuracy."""
+def extract_text_from_pdf(content: bytes, parallel: bool = True) -> str:
+    """Extract readable text from PDF bytes using the configured backend
+    (PDF_EXTRACTOR, default pdfminer) with automatic pdfminer fallback.
+    parallel=False disables page-parallel extraction of large PDFs."""
     try:
-        resource_manager = PDFResourceManager()
-        retstr = BytesIO()
-        laparams = LAParams()
-        device = TextConverter(resource_manager, retstr, laparams=laparams)
-        interpreter = PDFPageInterpreter(resource_manager, device)
-
-        for page in PDFPage.get_pages(BytesIO(content)):
-            interpreter.process_page(page)
-
-        text = retstr.getvalue().decode("utf-8", errors="ignore")
-        device.close()
-        retstr.close()
+        text = extract_with_fallback(content, parallel=parallel)
 
         if len(text.strip()) < 20:
             raise ValueError("PDF text too small")
@@ -91,6 +80,13 @@ CERT_KEYWORDS = [
     "admit", "hall ticket", "receipt", "payment", "application"
 ]
 
+NON_RESEARCH_RESULT = {
+    "success": False,
+    "type": "Not Research Paper",
+    "confidence": 0.98,
+    "message": "Document looks like a certificate, receipt, or non-research file."
+}
+
 def looks_like_non_research(text: str) -> bool:
     """Detect certificates, receipts, resumes or non-research files."""
     low = text.lower()
@@ -176,60 +172,86 @@ def home():
 # MAIN ANALYZE API
 # ======================================================
 @app.post("/analyze")
-async def analyze(file: UploadFile = File(...)):
+async def analyze(
+    file: UploadFile = File(...),
+    profile_token: Optional[str] = Header(None, alias=PROFILE_HEADER),
+):
+    profile_id = None
     try:
         if not file.filename.endswith(".pdf"):
             raise HTTPException(400, "Only PDF files allowed")
 
         content = await file.read()
-        text = extract_text_from_pdf(content)
-
-        # 1️⃣ HARD FILTER — detect non-research documents BEFORE BERT
-        if looks_like_non_research(text):
-            return {
-                "success": False,
-                "type": "Not Research Paper",
-                "confidence": 0.98,
-                "message": "Document looks like a certificate, receipt, or non-research file."
-            }
-
-        # 2️⃣ BERT PREDICT
-        label, conf = classify_with_bert(text)
-
-        if label == "NotResearch":
-            return {
-                "success": False,
-                "type": "Not Research Paper",
-                "confidence": conf,
-                "message": "This is not a research paper."
-            }
-
-        # 3️⃣ Map paper type
-        if label in ("Conference", "Journal"):
-            paper_type = label
-            paper_nature = "Research"
-        else:
-            paper_type = "Research Paper"
-            paper_nature = label
-
-        keywords = extract_keywords(text)
-        evidence = extract_evidence(text, paper_nature)
 
+        # Opt-in profiling (admin header or sampling) — no-op when off
+        profiler = start_profile(profile_token)
+        if profiler is None:
+            return analyze_pdf(file.filename, content)
+
+        # sequential extraction so cProfile sees pdfminer, not a futures wait
+        try:
+            result = analyze_pdf(file.filename, content, parallel=False)
+        finally:
+            profile_id = stop_profile(profiler)
+
+        result["profile_id"] = profile_id
+        return result
+
+    except Exception as e:
+        # keep the profile findable when the profiled request fails
+        suffix = f" (profile_id={profile_id})" if profile_id else ""
+        logger.error(f"ERROR: {e}{suffix}")
+        raise HTTPException(500, f"Processing failed: {e}{suffix}")
+
+
+# ======================================================
+# ANALYSIS PIPELINE (extract → filter → BERT → post-process)
+# ======================================================
+def analyze_pdf(filename: str, content: bytes, parallel: bool = True) -> dict:
+    text = extract_text_from_pdf(content, parallel=parallel)
+
+    # 1️⃣ HARD FILTER — detect non-research documents BEFORE BERT
+    if looks_like_non_research(text):
+        return dict(NON_RESEARCH_RESULT)
+
+    # 2️⃣ BERT PREDICT
+    label, conf = classify_with_bert(text)
+
+    return build_analysis(filename, text, label, conf)
+
+
+def build_analysis(filename: str, text: str, label: str, conf: float) -> dict:
+    """Turn a BERT prediction into the API response payload."""
+    if label == "NotResearch":
         return {
-            "success": True,
-            "filename": file.filename,
-            "bert_label": label,
-            "type": paper_type,
-            "nature": paper_nature,
-            "confidence": round(conf, 3),
-            "keywords": keywords,
-            "evidence": evidence,
-            "timestamp": datetime.now().isoformat()
+            "success": False,
+            "type": "Not Research Paper",
+            "confidence": conf,
+            "message": "This is not a research paper."
         }
 
-    except Exception as e:
-        logger.error(f"ERROR: {e}")
-        raise HTTPException(500, f"Processing failed: {e}")
+    # 3️⃣ Map paper type
+    if label in ("Conference", "Journal"):
+        paper_type = label
+        paper_nature = "Research"
+    else:
+        paper_type = "Research Paper"
+        paper_nature = label
+
+    keywords = extract_keywords(text)
+    evidence = extract_evidence(text, paper_nature)
+
+    return {
+        "success": True,
+        "filename": filename,
+        "bert_label": label,
+        "type": paper_type,
+        "nature": paper_nature,
+        "confidence": round(conf, 3),
+        "keywords": keywords,
+        "evidence": evidence,
+        "timestamp": datetime.now().isoformat()
+    }
 
 
 # ======================================================
@@ -0,0 +1,282 @@
+"""
+Pluggable PDF Text Extraction Backends
+- pdfminer        : full layout analysis (original behaviour, most accurate)
+- pdfminer-fast   : pdfminer with layout analysis disabled
+- pymupdf         : native MuPDF backend (optional dependency)
+- Config-selected backend with automatic fallback to pdfminer
+- Page-parallel pdfminer extraction for very large PDFs
+- Comparison mode: speed + text agreement on a sample corpus
+
+Usage (comparison):
+    python pdf_extractors.py compare samples/
+"""
+
+import os
+import sys
+import time
+import logging
+import multiprocessing
+from abc import ABC, abstractmethod
+from collections import Counter
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfpage import PDFPage
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONFIG (environment driven)
+# ==============================
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pdfminer")
+PDF_FALLBACK_MIN_CHARS = int(os.getenv("PDF_FALLBACK_MIN_CHARS", "200"))
+
+# Page-parallel extraction: only documents with at least this many pages
+# are split, and one document never uses more than MAX_WORKERS processes.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_PARALLEL_MAX_WORKERS = int(os.getenv("PDF_PARALLEL_MAX_WORKERS", str(min(os.cpu_count() or 1, 4))))
+
+
+# ==============================
+# Backends
+# ==============================
+class PdfExtractor(ABC):
+    """Base interface: bytes in, plain text out."""
+    name = "base"
+
+    @abstractmethod
+    def extract(self, content: bytes, parallel: bool = True) -> str:
+        """parallel=False forbids page splitting (ignored by backends without it)."""
+
+
+class PdfminerExtractor(PdfExtractor):
+    """pdfminer with optional layout analysis (LAParams).
+
+    Large documents are split into contiguous page ranges, extracted in
+    parallel and joined in page order; output is byte-identical to a
+    sequential run because pdfminer renders every page independently.
+    """
+
+    def __init__(self, layout: bool = True):
+        self.layout = layout
+        self.name = "pdfminer" if layout else "pdfminer-fast"
+
+    def extract(self, content: bytes, parallel: bool = True) -> str:
+        ranges = _page_ranges(content) if parallel else [None]
+        if len(ranges) <= 1:
+            raw = _pdfminer_pages(content, self.layout)
+        else:
+            try:
+                parts = _get_pool().map(
+                    _pdfminer_pages,
+                    [content] * len(ranges),
+                    [self.layout] * len(ranges),
+                    ranges,
+                )
+                raw = b"".join(parts)
+            except BrokenProcessPool:
+                # a worker died (e.g. OOM-killed); rebuild the pool next time
+                logger.warning("PDF worker pool broke — retrying this document sequentially")
+                _reset_pool()
+                raw = _pdfminer_pages(content, self.layout)
+
+        return raw.decode("utf-8", errors="ignore")
+
+
+class PymupdfExtractor(PdfExtractor):
+    """MuPDF (C library) via PyMuPDF — much faster than pure-Python pdfminer."""
+    name = "pymupdf"
+
+    def extract(self, content: bytes, parallel: bool = True) -> str:
+        if not PYMUPDF_AVAILABLE:
+            raise RuntimeError("pymupdf backend requested but PyMuPDF is not installed")
+
+        with fitz.open(stream=content, filetype="pdf") as doc:
+            return "".join(page.get_text() for page in doc)
+
+
+def _pdfminer_pages(content: bytes, layout: bool, pagenos=None) -> bytes:
+    """Render the given pages (all when None) to UTF-8 bytes."""
+    resource_manager = PDFResourceManager()
+    retstr = BytesIO()
+    laparams = LAParams() if layout else None
+    device = TextConverter(resource_manager, retstr, laparams=laparams)
+    interpreter = PDFPageInterpreter(resource_manager, device)
+
+    for page in PDFPage.get_pages(BytesIO(content), pagenos=pagenos):
+        interpreter.process_page(page)
+
+    raw = retstr.getvalue()
+    device.close()
+    retstr.close()
+    return raw
+
+
+# ==============================
+# Page-parallel helpers
+# ==============================
+_pool = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    # spawn (not fork): the API process already runs torch/asyncio threads
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PDF_PARALLEL_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _page_ranges(content: bytes) -> list:
+    """Split into at most PDF_PARALLEL_MAX_WORKERS contiguous page sets,
+    or a single range when splitting does not pay off."""
+    if PDF_PARALLEL_MAX_WORKERS <= 1:
+        return [None]
+
+    try:
+        n_pages = sum(1 for _ in PDFPage.get_pages(BytesIO(content)))
+    except Exception:
+        return [None]  # let the sequential path raise a proper error
+
+    if n_pages < PDF_PARALLEL_MIN_PAGES:
+        return [None]
+
+    n_ranges = min(PDF_PARALLEL_MAX_WORKERS, n_pages)
+    step = -(-n_pages // n_ranges)  # ceil division
+    return [set(range(i, min(i + step, n_pages))) for i in range(0, n_pages, step)]
+
+
+EXTRACTORS = {
+    "pdfminer": PdfminerExtractor(layout=True),
+    "pdfminer-fast": PdfminerExtractor(layout=False),
+    "pymupdf": PymupdfExtractor(),
+}
+
+
+# Fail at startup on a bad PDF_EXTRACTOR, not with a 500 on every upload
+if PDF_EXTRACTOR not in EXTRACTORS:
+    raise ValueError(f"Unknown PDF_EXTRACTOR '{PDF_EXTRACTOR}' (choose from {', '.join(EXTRACTORS)})")
+if PDF_EXTRACTOR == "pymupdf" and not PYMUPDF_AVAILABLE:
+    logger.warning("PDF_EXTRACTOR=pymupdf but PyMuPDF is not installed — every PDF will fall back to pdfminer")
+
+
+def get_extractor(name: str = None) -> PdfExtractor:
+    name = name or PDF_EXTRACTOR
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor '{name}' (choose from {', '.join(EXTRACTORS)})")
+    return EXTRACTORS[name]
+
+
+# ==============================
+# Extraction with fallback
+# ==============================
+def extract_with_fallback(content: bytes, name: str = None, parallel: bool = True) -> str:
+    """Run the configured backend; fall back to layout pdfminer when it
+    fails or yields too little text (scanned pages, odd encodings...)."""
+    extractor = get_extractor(name)
+    if extractor.name == "pdfminer":
+        return extractor.extract(content, parallel=parallel)
+
+    try:
+        text = extractor.extract(content, parallel=parallel)
+        if len(text.strip()) >= PDF_FALLBACK_MIN_CHARS:
+            return text
+        logger.info(f"{extractor.name} yielded {len(text.strip())} chars — falling back to pdfminer")
+    except Exception as e:
+        logger.warning(f"{extractor.name} failed ({e}) — falling back to pdfminer")
+
+    return EXTRACTORS["pdfminer"].extract(content, parallel=parallel)
+
+
+# ==============================
+# Comparison mode
+# ==============================
+def _agreement(a: str, b: str) -> float:
+    """Token-multiset overlap (Dice over word counts), ignoring whitespace,
+    layout and reading order. Linear in document length, unlike
+    SequenceMatcher, which goes quadratic on long papers."""
+    ta, tb = a.split(), b.split()
+    if not ta and not tb:
+        return 1.0
+    common = sum((Counter(ta) & Counter(tb)).values())
+    return 2 * common / (len(ta) + len(tb))
+
+
+def compare(sample_dir: str):
+    paths = sorted(
+        os.path.join(d, f)
+        for d, _, files in os.walk(sample_dir)
+        for f in files if f.lower().endswith(".pdf")
+    )
+    if not paths:
+        raise SystemExit(f"No PDFs found in {sample_dir}")
+
+    names = [n for n in EXTRACTORS if n != "pymupdf" or PYMUPDF_AVAILABLE]
+    stats = {n: {"secs": 0.0, "agree": 0.0, "failed": 0} for n in names}
+    split_docs = 0
+    mismatches = []
+
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+
+        outputs = {}
+        for n in names:
+            start = time.perf_counter()
+            try:
+                outputs[n] = EXTRACTORS[n].extract(content)
+            except Exception:
+                outputs[n] = ""
+                stats[n]["failed"] += 1
+            stats[n]["secs"] += time.perf_counter() - start
+
+        baseline = outputs["pdfminer"]
+        for n in names:
+            if n != "pdfminer":  # the baseline itself
+                stats[n]["agree"] += _agreement(baseline, outputs[n])
+
+        # page-parallel output must be identical to a sequential run
+        if len(_page_ranges(content)) > 1:
+            split_docs += 1
+            for n in ("pdfminer", "pdfminer-fast"):
+                if outputs[n] != EXTRACTORS[n].extract(content, parallel=False):
+                    mismatches.append(f"{n}: {path}")
+
+    print(f"\n📊 Extractor comparison on {len(paths)} PDFs (agreement vs pdfminer)\n")
+    print(f"{'backend':<15}{'total s':>10}{'docs/s':>10}{'agreement':>12}{'failed':>8}")
+    for n in names:
+        s = stats[n]
+        agree = "—" if n == "pdfminer" else f"{s['agree'] / len(paths):.3f}"
+        print(f"{n:<15}{s['secs']:>10.2f}{len(paths) / max(s['secs'], 1e-9):>10.2f}"
+              f"{agree:>12}{s['failed']:>8}")
+
+    print(f"\n🧩 Page-parallel check: {split_docs} PDFs split, {len(mismatches)} mismatches")
+    if mismatches:
+        for m in mismatches:
+            print(f"  ❌ {m}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "compare":
+        raise SystemExit("Usage: python pdf_extractors.py compare <sample_dir>")
+    compare(sys.argv[2])
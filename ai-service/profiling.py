@@ -0,0 +1,88 @@
+"""
+On-demand request profiling for the AI service
+- Opt-in per request (admin header) or by sampling rate
+- cProfile across extraction, chunking, BERT forward pass + post-processing
+- Profiles written to a bounded, rotating directory
+- Zero overhead when disabled (no profiler is ever created)
+"""
+
+import os
+import hmac
+import glob
+import time
+import uuid
+import random
+import logging
+import cProfile
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# ==============================
+# CONFIG (environment driven)
+# ==============================
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+PROFILE_HEADER = "X-Profile-Token"
+
+
+# ==============================
+# Decide whether to profile
+# ==============================
+def should_profile(header_token: Optional[str]) -> bool:
+    """True when the admin header matches or the request is sampled."""
+    if PROFILE_ADMIN_TOKEN and header_token and \
+            hmac.compare_digest(header_token.encode(), PROFILE_ADMIN_TOKEN.encode()):
+        return True
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return True
+    return False
+
+
+# ==============================
+# Start / Stop
+# ==============================
+def start_profile(header_token: Optional[str]) -> Optional[cProfile.Profile]:
+    """Return an enabled profiler, or None when this request is not profiled."""
+    if not should_profile(header_token):
+        return None
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profile(profiler: cProfile.Profile) -> Optional[str]:
+    """Disable the profiler, dump it to PROFILE_DIR and return its id."""
+    profiler.disable()
+
+    profile_id = f"{time.time_ns() // 1_000_000}-{uuid.uuid4().hex[:8]}"
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"{profile_id}.prof")
+        profiler.dump_stats(path)
+        _rotate()
+    except OSError as e:
+        logger.error(f"Failed to write profile {profile_id}: {e}")
+        return None
+
+    logger.info(f"Request profile saved → {path}")
+    return profile_id
+
+
+# ==============================
+# Rotation (keep newest N files)
+# ==============================
+def _rotate():
+    files = sorted(
+        glob.glob(os.path.join(PROFILE_DIR, "*.prof")),
+        key=os.path.getmtime,
+    )
+    for old in files[:max(len(files) - PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
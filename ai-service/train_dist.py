@@ -0,0 +1,118 @@
+"""
+CPU Data-Parallel Training Helpers (shared by train.py / train_from_raw.py)
+- gloo process group across N local processes (launched with torchrun)
+- Per-process thread count + CPU core pinning (no oversubscription)
+- Samples/sec logging to compare scaling across process counts
+
+Usage:
+    torchrun --nproc_per_node=4 train.py
+    torchrun --nproc_per_node=4 train_from_raw.py
+"""
+
+import os
+import time
+from datetime import timedelta
+
+import torch
+import torch.distributed as dist
+from transformers import TrainerCallback
+
+# Generous default: rank 0 may do slow work (e.g. PDF extraction) first
+DDP_TIMEOUT_MIN = int(os.getenv("TRAIN_DDP_TIMEOUT_MIN", "360"))
+
+
+# ==============================
+# Process group + thread pinning
+# ==============================
+def setup_distributed():
+    """Initialise gloo when launched by torchrun; returns (rank, world_size).
+
+    Each local process gets an equal, disjoint slice of the CPU cores and
+    a matching torch thread count, so N processes never oversubscribe.
+    """
+    world_size = int(os.getenv("WORLD_SIZE", "1"))
+    rank = int(os.getenv("RANK", "0"))
+
+    if world_size <= 1:
+        return rank, world_size
+
+    local_rank = int(os.getenv("LOCAL_RANK", "0"))
+    local_world = int(os.getenv("LOCAL_WORLD_SIZE", str(world_size)))
+
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") \
+        else list(range(os.cpu_count() or 1))
+    per_proc = max(1, len(cores) // local_world)
+    my_cores = cores[local_rank * per_proc:(local_rank + 1) * per_proc] or cores
+
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, my_cores)
+    torch.set_num_threads(len(my_cores))
+
+    if not dist.is_initialized():
+        dist.init_process_group(backend="gloo", timeout=timedelta(minutes=DDP_TIMEOUT_MIN))
+
+    if rank == 0:
+        print(f"🧵 gloo DDP: {world_size} processes × {len(my_cores)} threads")
+
+    return rank, world_size
+
+
+def barrier():
+    if dist.is_initialized():
+        dist.barrier()
+
+
+def ddp_training_args(world_size: int) -> dict:
+    """Extra TrainingArguments for multi-process CPU runs."""
+    if world_size <= 1:
+        return {}
+    return {
+        "ddp_backend": "gloo",
+        "ddp_find_unused_parameters": False,
+        "ddp_timeout": DDP_TIMEOUT_MIN * 60,
+    }
+
+
+def grad_accum_steps(world_size: int, per_device: int = 4, target: int = 16) -> int:
+    """Accumulation steps keeping the effective batch near `target`.
+
+    Exact only when per_device × world_size divides target (1, 2, 4
+    processes at the defaults); otherwise warns with the real value.
+    """
+    steps = max(1, target // (per_device * world_size))
+    effective = per_device * steps * world_size
+    if effective != target and int(os.getenv("RANK", "0")) == 0:
+        print(f"[WARN] Effective batch is {effective} (not {target}) with {world_size} processes")
+    return steps
+
+
+# ==============================
+# Throughput logging
+# ==============================
+class ThroughputCallback(TrainerCallback):
+    """Logs global training samples/sec for every logging window."""
+
+    def __init__(self):
+        self._t = None
+        self._step = 0
+
+    def on_train_begin(self, args, state, control, **kwargs):
+        self._t = time.perf_counter()
+        self._step = state.global_step
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if logs is None or "loss" not in logs:
+            return
+
+        now = time.perf_counter()
+        steps = state.global_step - self._step
+        samples = steps * args.per_device_train_batch_size \
+            * args.gradient_accumulation_steps * args.world_size
+        if steps > 0 and now > self._t:
+            logs["samples_per_sec"] = round(samples / (now - self._t), 2)
+            if state.is_world_process_zero:
+                print(f"⚡ step {state.global_step}: {logs['samples_per_sec']} samples/sec "
+                      f"({args.world_size} procs)")
+
+        self._t = now
+        self._step = state.global_step
@@ -0,0 +1,148 @@
+"""
+Reduced-Precision / Memory-Lean Training Mode (shared by train.py / train_from_raw.py)
+- Opt-in with TRAIN_LEAN=1 (default: original fp32 pipeline)
+- bf16 autocast on CPU + gradient checkpointing
+- Low-memory optimizer (TRAIN_OPTIM, default adafactor)
+- Longer context (TRAIN_MAX_LEN, default 512 in lean mode)
+- Peak memory + step time logging for every mode
+- Accuracy check against the recorded fp32 baseline
+
+Usage:
+    python train.py                              # fp32, records baseline accuracy
+    TRAIN_LEAN=1 python train.py                 # lean, checked against baseline
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+from transformers import TrainerCallback
+
+# ==============================
+# CONFIG (environment driven)
+# ==============================
+LEAN_MODE = os.getenv("TRAIN_LEAN", "0") == "1"
+MAX_LEN = int(os.getenv("TRAIN_MAX_LEN", "512" if LEAN_MODE else "384"))
+LEAN_OPTIM = os.getenv("TRAIN_OPTIM", "adafactor")
+ACCURACY_TOLERANCE = float(os.getenv("TRAIN_ACC_TOLERANCE", "0.02"))
+
+BASELINE_DIR = "./bert_results"
+
+
+def mode_name() -> str:
+    return "lean (bf16)" if LEAN_MODE else "fp32"
+
+
+def lean_training_args() -> dict:
+    """Extra TrainingArguments for the lean mode (empty in fp32 mode)."""
+    if not LEAN_MODE:
+        return {}
+    return {
+        "bf16": True,                 # CPU autocast to bfloat16
+        "gradient_checkpointing": True,
+        "gradient_checkpointing_kwargs": {"use_reentrant": False},
+        "optim": LEAN_OPTIM,
+    }
+
+
+# ==============================
+# Peak memory + step time
+# ==============================
+def _peak_rss_mb():
+    """Peak resident memory in MB, or None where unavailable (Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _fmt_mb(mb) -> str:
+    return "n/a" if mb is None else f"{mb:.1f} MB"
+
+
+class MemoryStepCallback(TrainerCallback):
+    """Adds peak RSS (MB) and mean optimizer-step time (s) to every log."""
+
+    def __init__(self):
+        self._t = None
+        self._total = 0.0
+        self._steps = 0
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self._t = time.perf_counter()
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self._t is not None:
+            self._total += time.perf_counter() - self._t
+            self._steps += 1
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        if logs is None or "loss" not in logs or not self._steps:
+            return
+
+        peak = _peak_rss_mb()
+        logs["step_time_s"] = round(self._total / self._steps, 3)
+        if peak is not None:
+            logs["peak_mem_mb"] = round(peak, 1)
+        if state.is_world_process_zero:
+            print(f"🧠 [{mode_name()}] step {state.global_step}: "
+                  f"{logs['step_time_s']}s/step, peak {_fmt_mb(peak)}")
+
+        self._total = 0.0
+        self._steps = 0
+
+
+# ==============================
+# Accuracy check vs fp32 baseline
+# ==============================
+def dataset_fingerprint(texts, labels) -> str:
+    """Stable id of the exact rows a run was evaluated on."""
+    h = hashlib.sha1()
+    for text, label in zip(texts, labels):
+        h.update(f"{label}\t{text}\n".encode("utf-8", errors="ignore"))
+    return h.hexdigest()[:16]
+
+
+def check_accuracy(accuracy: float, name: str, fingerprint: str) -> bool:
+    """fp32 runs record their accuracy per script (`name`); lean runs of the
+    same script on the same data (`fingerprint`) must stay within
+    ACCURACY_TOLERANCE of it. Returns False when the lean model regressed."""
+    print(f"🎯 [{mode_name()}] eval accuracy: {accuracy:.4f}, peak memory: {_fmt_mb(_peak_rss_mb())}")
+
+    baseline_file = os.path.join(BASELINE_DIR, f"fp32_baseline_{name}.json")
+
+    if not LEAN_MODE:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_file, "w") as f:
+            json.dump({"accuracy": accuracy, "max_len": MAX_LEN, "dataset": fingerprint}, f)
+        return True
+
+    if not os.path.exists(baseline_file):
+        print(f"[WARN] No fp32 baseline for {name} — run it once without TRAIN_LEAN to enable the check.")
+        return True
+
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+
+    if baseline.get("dataset") != fingerprint:
+        print(f"[WARN] fp32 baseline for {name} was recorded on a different dataset "
+              f"— skipping the accuracy check; re-run fp32 to refresh it.")
+        return True
+
+    ref = baseline["accuracy"]
+    if accuracy < ref - ACCURACY_TOLERANCE:
+        print(f"❌ Lean accuracy {accuracy:.4f} (max_len={MAX_LEN}) is more than {ACCURACY_TOLERANCE} "
+              f"below fp32 baseline {ref:.4f} (max_len={baseline.get('max_len')})")
+        return False
+
+    print(f"✅ Within tolerance of fp32 baseline {ref:.4f} (±{ACCURACY_TOLERANCE}; "
+          f"max_len {baseline.get('max_len')} → {MAX_LEN})")
+    return True